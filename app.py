@@ -1,22 +1,76 @@
+from collections import deque
+
 import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output, State
+from dash import ctx, dcc, html, no_update, Patch
+from dash.dependencies import ClientsideFunction, Input, Output, State
+from dash.exceptions import PreventUpdate
 import plotly.graph_objs as go
 import dash_bootstrap_components as dbc
 import numpy as np
 
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Random generator for points added without coordinates
+rng = np.random.default_rng()
+
 # Initialize the Dash app
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 
+# Layout of the plot, built once since it never changes
+PLOT_LAYOUT = go.Layout(
+    xaxis=dict(range=[0, 10], title='X-axis'),
+    yaxis=dict(range=[0, 10], title='Y-axis'),
+    title="Interactive Graph with Movable Points"
+)
+
+# Create an empty plot, points are filled in by the callback through a Patch
+def create_plot():
+    return go.Figure(
+        data=[go.Scatter(
+            x=[], 
+            y=[], 
+            mode='markers+text', 
+            text=[], 
+            textposition='top center', 
+            marker=dict(size=10, color='red')
+        )],
+        layout=PLOT_LAYOUT
+    )
+
+# Static help text, rendered as a single component
+HELP_MD = dcc.Markdown("""
+#### How to Use the App
+
+1. Enter the X and Y coordinates in the input fields and click 'Add Point' to add a point at the specified coordinates.
+2. If the coordinates are left empty and 'Add Point' is clicked, a point will be added at a random location.
+3. Click 'Remove Point' to remove the last added point.
+4. The list on the right shows the points sorted by their Y-axis value from top to bottom. Points close to each other on the Y-axis are further sorted from left to right.
+
+#### Sorting Explanation
+
+The points are sorted using the following steps:
+
+1. First, all points are sorted by their Y-axis values in descending order (from top to bottom).
+2. Next, points are grouped together if their Y-axis values are within a specified tolerance. This means that points that are close to each other on the Y-axis will be considered part of the same group.
+3. Within each group, the points are then sorted by their X-axis values in ascending order (from left to right).
+4. Finally, the sorted points are displayed in the list on the right side of the app, with visual separators (horizontal lines) between different groups.
+
+This sorting method ensures that points are grouped together when they are close on the Y-axis, and within each group, they are ordered by their X-axis values. This helps in visually organizing the points on the right side panel, making it easier to understand their relative positions.
+""")
+
 # Layout of the app
 app.layout = dbc.Container([
     dbc.Row([
         dbc.Col([
-            dcc.Graph(id='interactive-graph')
+            dcc.Graph(id='interactive-graph', figure=create_plot())
         ], width=8),
         dbc.Col([
             html.H4("Points List (sorted by y-axis):"),
-            html.Div(id='points-list')
+            dcc.Markdown(id='points-list', dangerously_allow_html=True)
         ], width=4)
     ]),
     dbc.Row([
@@ -24,170 +78,254 @@ app.layout = dbc.Container([
             dbc.Input(id="x-coord", type="number", placeholder="X coordinate", style={"margin-right": "10px"}),
             dbc.Input(id="y-coord", type="number", placeholder="Y coordinate", style={"margin-right": "10px"}),
             dbc.Button("Add Point", id="add-point-button", color="primary", className="mr-1"),
-            dbc.Button("Remove Point", id="remove-point-button", color="danger", className="mr-1")
+            dbc.Button("Remove Point", id="remove-point-button", color="danger", className="mr-1"),
+            dcc.Store(id='add-clicks-debounced'),
+            dcc.Store(id='remove-clicks-debounced'),
+            dcc.Store(id='points-store', data={'xy': [], 'names': [], 'free_names': [], 'counter': 0, 'add_clicks': 0, 'remove_clicks': 0})
         ], width=12)
     ]),
     dbc.Row([
         dbc.Col([
-            html.H4("How to Use the App"),
-            html.P("1. Enter the X and Y coordinates in the input fields and click 'Add Point' to add a point at the specified coordinates."),
-            html.P("2. If the coordinates are left empty and 'Add Point' is clicked, a point will be added at a random location."),
-            html.P("3. Click 'Remove Point' to remove the last added point."),
-            html.P("4. The list on the right shows the points sorted by their Y-axis value from top to bottom. Points close to each other on the Y-axis are further sorted from left to right."),
-            html.H4("Sorting Explanation"),
-            html.P("The points are sorted using the following steps:"),
-            html.Ol([
-                html.Li("First, all points are sorted by their Y-axis values in descending order (from top to bottom)."),
-                html.Li("Next, points are grouped together if their Y-axis values are within a specified tolerance. This means that points that are close to each other on the Y-axis will be considered part of the same group."),
-                html.Li("Within each group, the points are then sorted by their X-axis values in ascending order (from left to right)."),
-                html.Li("Finally, the sorted points are displayed in the list on the right side of the app, with visual separators (horizontal lines) between different groups."),
-            ]),
-            html.P("This sorting method ensures that points are grouped together when they are close on the Y-axis, and within each group, they are ordered by their X-axis values. This helps in visually organizing the points on the right side panel, making it easier to understand their relative positions."),
+            dbc.Collapse(HELP_MD, is_open=True)
         ], width=12)
     ])
 ], fluid=True)
 
-# Initialize points
-points = {'x': [], 'y': [], 'names': []}
-used_names = set()
-removed_names = []
+# Storage for the points of one session in insertion order
+# Coordinates live in a contiguous (capacity, 2) array that grows geometrically
+# The state round-trips through the 'points-store' dcc.Store with from_data/to_data
+class PointStore:
+    def __init__(self, capacity=64):
+        self.xy = np.empty((capacity, 2))
+        self.names = []
+        self.free_names = deque()  # Names of removed points, reused first
+        self.next_name_index = 0
+        self.handled_add_clicks = 0  # n_clicks of each button already applied to the points
+        self.handled_remove_clicks = 0
+        self.n = 0
+
+    @classmethod
+    def from_data(cls, data):
+        n = len(data['names'])
+        store = cls(capacity=max(64, 2 * n))
+        if n:
+            store.xy[:n] = data['xy']
+        store.names = list(data['names'])
+        store.free_names = deque(data['free_names'])
+        store.next_name_index = data['counter']
+        store.handled_add_clicks = data['add_clicks']
+        store.handled_remove_clicks = data['remove_clicks']
+        store.n = n
+        return store
+
+    def to_data(self):
+        return {
+            'xy': self.xy[:self.n].tolist(),
+            'names': self.names,
+            'free_names': list(self.free_names),
+            'counter': self.next_name_index,
+            'add_clicks': self.handled_add_clicks,
+            'remove_clicks': self.handled_remove_clicks
+        }
+
+    def add(self, x, y, name):
+        if self.n == len(self.xy):
+            self.xy = np.resize(self.xy, (2 * self.n, 2))
+        self.xy[self.n] = (x, y)
+        self.names.append(name)
+        self.n += 1
+
+    def remove_last(self):
+        self.n -= 1
+        return self.xy[self.n, 0], self.xy[self.n, 1], self.names.pop()
+
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+
+# Opening tags of the points list rows, alternating backgrounds within a group
+ROW_OPENING_TAGS = ('<div style="background-color: #f0f0f0">', '<div style="background-color: #ffffff">')
 
 # Generate point names
-def generate_point_name():
-    if removed_names:
-        return removed_names.pop(0)
-    
-    for char in 'abcdefghijklmnopqrstuvwxyz':
-        name = char
-        if name not in used_names:
-            used_names.add(name)
-            return name
-
-    i = 1
-    while True:
-        for char in 'abcdefghijklmnopqrstuvwxyz':
-            name = f'{char}{i}'
-            if name not in used_names:
-                used_names.add(name)
-                return name
-        i += 1
-
-# Create an empty plot
-def create_plot():
-    return go.Figure(
-        data=[go.Scatter(
-            x=points['x'], 
-            y=points['y'], 
-            mode='markers+text', 
-            text=points['names'], 
-            textposition='top center', 
-            marker=dict(size=10, color='red')
-        )],
-        layout=go.Layout(
-            xaxis=dict(range=[0, 10], title='X-axis'),
-            yaxis=dict(range=[0, 10], title='Y-axis'),
-            title="Interactive Graph with Movable Points"
-        )
-    )
+def generate_point_name(points):
+    if points.free_names:
+        return points.free_names.popleft()
+
+    i = points.next_name_index
+    points.next_name_index += 1
+    return ALPHABET[i % 26] if i < 26 else f'{ALPHABET[i % 26]}{i // 26}'
+
+# Kernels that take point indices sorted by y descending, assign group ids and sort each group by x
+# A new group starts at the first point that is at least `tolerance` below the top point of the current group
+
+# Point count from which the Numba kernel is used, below it the one-time compile costs more than it saves
+NUMBA_MIN_POINTS = 5000
+
+# Numba version for large point counts, compiled on first use (a few seconds per worker)
+if HAS_NUMBA:
+    @njit(cache=True)
+    def group_by_y_numba(xs, ys, order, tolerance):
+        order = order.copy()
+        n = order.shape[0]
+        group_ids = np.zeros(n, dtype=np.int64)
+        top = 0
+        for i in range(1, n):
+            group_ids[i] = group_ids[i - 1]
+            if ys[order[top]] - ys[order[i]] >= tolerance:
+                group_ids[i] += 1
+                top = i
+
+        # Sort by x within each group, one stable argsort per group keeps this O(n log n)
+        start = 0
+        for i in range(1, n + 1):
+            if i == n or group_ids[i] != group_ids[start]:
+                if i - start > 1:
+                    group = order[start:i]
+                    order[start:i] = group[np.argsort(xs[group], kind='mergesort')]
+                start = i
+
+        return order, group_ids
 
-# Helper function to calculate the max y distance in a group
-def max_y_distance(group):
-    if not group:
-        return 0
-    y_values = [p[1] for p in group]
-    return max(y_values) - min(y_values)
+# NumPy version, the default for the small point counts this app usually has
+def group_by_y(xs, ys, order, tolerance):
+    group_ids = []
+    group = 0
+    top = ys[order[0]]
+    for y in ys[order].tolist():
+        if top - y >= tolerance:
+            group += 1
+            top = y
+        group_ids.append(group)
+    group_ids = np.array(group_ids)
+
+    # Sort by x within each group, keeping the groups in place
+    order = order[np.lexsort((xs[order], group_ids))]
+
+    return order, group_ids
 
 # Helper function to find the optimal grouping
-def find_optimal_grouping(points, tolerance):
-    points = sorted(points, key=lambda p: -p[1])  # Sort points by y descending
-    groups = []
-    current_group = []
-
-    for point in points:
-        if not current_group:
-            current_group.append(point)
-        else:
-            max_y = max(current_group, key=lambda p: p[1])[1]
-            min_y = min(current_group, key=lambda p: p[1])[1]
-            current_max_distance = max_y - min_y
-            new_max_distance = max_y_distance(current_group + [point])
-
-            if new_max_distance < tolerance:
-                current_group.append(point)
-            else:
-                # Try to split the group optimally
-                new_group = [point]
-                remaining_group = current_group[:]
-                
-                for p in current_group:
-                    temp_group = new_group + [p]
-                    temp_remaining_group = remaining_group[:]
-                    temp_remaining_group.remove(p)
-                    if max_y_distance(temp_group) < max_y_distance(temp_remaining_group + [p]):
-                        new_group.append(p)
-                        remaining_group.remove(p)
-                
-                groups.append(remaining_group)
-                current_group = new_group
-
-    if current_group:
-        groups.append(current_group)
-    
-    return groups
+# Returns one array of point indices per group
+def find_optimal_grouping(xy, tolerance):
+    # Zero or one point needs no grouping
+    if len(xy) <= 1:
+        return [np.arange(len(xy))] if len(xy) else []
+
+    order = np.argsort(-xy[:, 1], kind='stable')  # Sort points by y descending
+
+    if HAS_NUMBA and len(order) >= NUMBA_MIN_POINTS:
+        order, group_ids = group_by_y_numba(xy[:, 0], xy[:, 1], order, tolerance)
+    else:
+        order, group_ids = group_by_y(xy[:, 0], xy[:, 1], order, tolerance)
+
+    splits = np.flatnonzero(np.diff(group_ids)) + 1
+    return np.split(order, splits)
+
+# Add `count` points, at the given coordinates or at random ones when they are empty
+def add_points(points, count, x_coord, y_coord):
+    if count <= 0:
+        return False
+
+    if x_coord is None or y_coord is None:
+        coords = rng.uniform(0, 10, (count, 2))
+    else:
+        coords = [(x_coord, y_coord)] * count
+
+    for x, y in coords:
+        name = generate_point_name(points)
+        points.add(x, y, name)
+    return True
+
+# Remove up to `count` of the last added points
+def remove_points(points, count):
+    count = min(count, points.n)
+    for _ in range(count):
+        _, _, name = points.remove_last()
+        points.free_names.append(name)
+    return count > 0
+
+# Clientside callbacks that coalesce rapid button clicks, at most one server update per 300 ms per button
+# The stores receive the button's n_clicks, see assets/clientside.js
+app.clientside_callback(
+    ClientsideFunction(namespace='debounce', function_name='coalesceClicks'),
+    Output('add-clicks-debounced', 'data'),
+    Input('add-point-button', 'n_clicks'),
+    prevent_initial_call=True
+)
+app.clientside_callback(
+    ClientsideFunction(namespace='debounce', function_name='coalesceClicks'),
+    Output('remove-clicks-debounced', 'data'),
+    Input('remove-point-button', 'n_clicks'),
+    prevent_initial_call=True
+)
 
 # Callback to update the graph and points list when buttons are clicked
 @app.callback(
     Output('interactive-graph', 'figure'),
     Output('points-list', 'children'),
-    Input('add-point-button', 'n_clicks'),
-    Input('remove-point-button', 'n_clicks'),
+    Output('points-store', 'data'),
+    Input('add-clicks-debounced', 'data'),
+    Input('remove-clicks-debounced', 'data'),
     State('x-coord', 'value'),
-    State('y-coord', 'value')
+    State('y-coord', 'value'),
+    State('points-store', 'data')
 )
-def update_graph_and_list(add_clicks, remove_clicks, x_coord, y_coord):
-    ctx = dash.callback_context
-    triggered_id = ctx.triggered[0]['prop_id'].split('.')[0]
-
-    if triggered_id == 'add-point-button':
-        if x_coord is None or y_coord is None:
-            x_coord = np.random.uniform(0, 10)
-            y_coord = np.random.uniform(0, 10)
-
-        name = generate_point_name()
-        points['x'].append(x_coord)
-        points['y'].append(y_coord)
-        points['names'].append(f'{name} ({x_coord:.2f}, {y_coord:.2f})')
-    
-    elif triggered_id == 'remove-point-button' and points['x']:
-        removed_x = points['x'].pop()
-        removed_y = points['y'].pop()
-        removed_name = points['names'].pop()
-        name = removed_name.split()[0]  # Get the name without coordinates
-        used_names.remove(name)
-        removed_names.append(name)
-
-    # Prepare points data
-    point_data = list(zip(points['x'], points['y'], points['names']))
+def update_graph_and_list(add_clicks, remove_clicks, x_coord, y_coord, points_data):
+    triggered_id = ctx.triggered_id
+
+    # Nothing to do on initial load, the layout already holds the empty figure
+    if not triggered_id:
+        raise PreventUpdate
+
+    points = PointStore.from_data(points_data)
+
+    # Apply every click not handled yet, including clicks of an earlier request the renderer dropped
+    add_count = (add_clicks or 0) - points.handled_add_clicks
+    remove_count = (remove_clicks or 0) - points.handled_remove_clicks
+    points.handled_add_clicks += add_count
+    points.handled_remove_clicks += remove_count
+
+    # The triggering button was clicked last, so the other button's pending clicks go first
+    if triggered_id == 'add-clicks-debounced':
+        changed = remove_points(points, remove_count)
+        changed = add_points(points, add_count, x_coord, y_coord) or changed
+    else:
+        changed = add_points(points, add_count, x_coord, y_coord)
+        changed = remove_points(points, remove_count) or changed
+
+    # Nothing changes when there are no points left to remove, only the handled clicks are stored
+    if not changed:
+        return no_update, no_update, points.to_data()
+
+    xy = points.xy[:points.n]
 
     # Find optimal grouping
     tolerance = 1  # Tolerance for y-values to consider points close
-    grouped_points = find_optimal_grouping(point_data, tolerance)
+    grouped_points = find_optimal_grouping(xy, tolerance)
 
-    # Sort each group by x-axis
-    grouped_points = [sorted(group, key=lambda p: p[0]) for group in grouped_points]
+    # Format the point labels and list entries
+    labels = []
+    entries = []
+    for name, (x, y) in zip(points.names, xy.tolist()):
+        coords = f'({x:.2f}, {y:.2f})'
+        labels.append(f'{name} {coords}')
+        entries.append(f'{name} {coords}: {coords}')
 
-    # Flatten the list
-    sorted_within_tolerance = [point for group in grouped_points for point in group]
-
-    # Create a list of HTML elements with visual separation for groups
-    points_list = []
+    # Render the list as a single HTML string with visual separation for groups
+    parts = []
     for i, group in enumerate(grouped_points):
         if i > 0:
-            points_list.append(html.Hr())  # Add a divider between groups
-        for j, (x, y, name) in enumerate(group):
-            points_list.append(html.Div(f'{name}: ({x:.2f}, {y:.2f})', style={'backgroundColor': '#f0f0f0' if j % 2 == 0 else '#ffffff'}))
+            parts.append('<hr/>\n')  # Add a divider between groups
+        for j, k in enumerate(group):
+            parts.append(ROW_OPENING_TAGS[j % 2])
+            parts.append(entries[k])
+            parts.append('</div>\n')
+    points_list = ''.join(parts)
+
+    # Only send the trace data that changed instead of a whole new figure
+    patched_figure = Patch()
+    patched_figure['data'][0]['x'] = xy[:, 0].tolist()
+    patched_figure['data'][0]['y'] = xy[:, 1].tolist()
+    patched_figure['data'][0]['text'] = labels
 
-    return create_plot(), points_list
+    return patched_figure, points_list, points.to_data()
 
 if __name__ == '__main__':
     app.run_server(debug=True)
@@ -0,0 +1,39 @@
+// Minimum time between two store updates of the same button, in milliseconds
+const CLICK_THROTTLE_MS = 300;
+
+// Per-store bookkeeping for coalesceClicks
+const throttleTimers = {};
+const latestClicks = {};
+const sentClicks = {};
+
+// Send the latest n_clicks if it changed, then hold further updates for CLICK_THROTTLE_MS
+function flushClicks(storeId) {
+    if (latestClicks[storeId] === sentClicks[storeId]) {
+        throttleTimers[storeId] = null;
+        return;
+    }
+
+    sentClicks[storeId] = latestClicks[storeId];
+    window.dash_clientside.set_props(storeId, {data: latestClicks[storeId]});
+    throttleTimers[storeId] = window.setTimeout(function () {
+        flushClicks(storeId);
+    }, CLICK_THROTTLE_MS);
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    debounce: {
+        // Throttle a button's clicks: the first click is sent right away, later ones within
+        // CLICK_THROTTLE_MS are coalesced into one store update at the end of the window
+        // The store data is the button's n_clicks, the server applies the clicks it has not handled yet
+        coalesceClicks: function (nClicks) {
+            const storeId = window.dash_clientside.callback_context.outputs_list.id;
+            latestClicks[storeId] = nClicks || 0;
+
+            if (!throttleTimers[storeId]) {
+                flushClicks(storeId);
+            }
+
+            return window.dash_clientside.no_update;
+        }
+    }
+});